@@ -1,9 +1,14 @@
+import functools
+
+from cetino.utils.string_utils import add_quote_many
+
+
 class BaseSQLBuilder:
     _select_clause_sep = "\n"
     _declare_clause_sep = ",\n"
     _field_declare_sep = ",\n"
-
-
+    _no_limit = None
+    """LIMIT value meaning no limit, emitted when an OFFSET is given without a LIMIT, for dialects that require one."""
 
     @staticmethod
     def primary_key_sql(primary_key_tuple):
@@ -13,15 +18,13 @@ class BaseSQLBuilder:
     def fields_declare_sql(cls, fields_dict):
         if not isinstance(fields_dict, dict):
             raise TypeError(f"fields_dict must be a dict({{[FIELD_NAME]:[FIELD_TYPE]}}), got {type(fields_dict)}")
-        fields_str = cls._field_declare_sep.join([f'{field} {(fields_dict[field]).value}' for field in fields_dict])
-        return fields_str
+        return cls._field_declare_sep.join(f'{name} {data_type.value}' for name, data_type in fields_dict.items())
 
     @staticmethod
     def unique_sql(unique_tuple):
-        if not unique_tuple or len(unique_tuple) == 0:
+        if not unique_tuple:
             return ''
-        else:
-            return f'UNIQUE ({", ".join(unique_tuple)})'
+        return f'UNIQUE ({", ".join(unique_tuple)})'
 
     @staticmethod
     def where_clause(cond_list: list):
@@ -45,11 +48,95 @@ class BaseSQLBuilder:
 
     @staticmethod
     def limit_clause(limit: int):
-        return f'LIMIT {limit}' if limit else ''
+        """`LIMIT 0` is a valid clause, only `None` means no limit."""
+        return '' if limit is None else f'LIMIT {limit}'
 
     @staticmethod
     def offset_clause(offset: int):
-        return f'OFFSET {offset}' if offset else ''
+        return '' if offset is None else f'OFFSET {offset}'
+
+    @classmethod
+    def query_sql(cls, table_name: str, fields_list=None, cond_list=None, order_by_dict=None, limit=None, offset=None):
+        return cls._query_sql(table_name, tuple(fields_list or ()), tuple(cond_list or ()),
+                              tuple(order_by_dict.items()) if order_by_dict else (), limit, offset)
+
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def _query_sql(cls, table_name: str, fields_list: tuple, cond_list: tuple, order_by_items: tuple, limit, offset):
+        fields_str = ', '.join(fields_list) if fields_list else "*"
+        parts = [f"SELECT {fields_str}", f"FROM {table_name}"]
+        if cond_list:
+            parts.append(cls.where_clause(cond_list))
+        if order_by_items:
+            parts.append(cls.order_by_clause(dict(order_by_items)))
+        if limit is None and offset is not None:
+            limit = cls._no_limit
+        if limit is not None:
+            parts.append(cls.limit_clause(limit))
+        if offset is not None:
+            parts.append(cls.offset_clause(offset))
+        return f"{cls._select_clause_sep.join(parts)};"
+
+    @classmethod
+    def insert_sql(cls, table_name: str, data_dict_list: list):
+        if not data_dict_list:
+            raise ValueError(f"data_dict_list must be a list of dict, got {data_dict_list}")
+        return cls.insert_sql_columnar(table_name, tuple(data_dict_list[0]),
+                                       [data_dict.values() for data_dict in data_dict_list])
+
+    @classmethod
+    def insert_sql_columnar(cls, table_name: str, columns: tuple, rows: list):
+        """
+        Generate insert sql from rows of values sharing one column order, no per-row key handling.
+
+        e.g. ('name', 'age'), [("John", 25)] -> 'INSERT INTO users (name, age) VALUES ("John", 25);'
+
+        :param table_name: (str) table name
+        :param columns: (tuple) column names
+        :param rows: (list<tuple>) rows of values ordered as `columns`
+        :return: (str) insert sql
+        """
+        if not rows:
+            raise ValueError(f"rows must be a non-empty list of tuple, got {rows}")
+        return f"{cls._insert_prefix(table_name, tuple(columns))}{cls._render_values(rows)};"
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _insert_prefix(cls, table_name: str, keys: tuple):
+        """`INSERT INTO ... VALUES ` prefix, computed once per (table, columns) shape."""
+        return f"INSERT INTO {table_name} ({', '.join(keys)}) VALUES "
+
+    @classmethod
+    def _render_values(cls, rows):
+        """
+        Render the VALUES fragment of an INSERT statement in a single writer pass.
+
+        e.g. [("John", 25), ("Jane", 30)] -> '("John", 25), ("Jane", 30)'
+
+        :param rows: (iterable) rows, each an iterable of values
+        :return: (str) values fragment
+        """
+        format_row = cls._format_row
+        out = []
+        append = out.append
+        for row in rows:
+            append('(')
+            append(', '.join(format_row(row)))
+            append('), ')
+        out[-1] = ')'
+        return ''.join(out)
+
+    @staticmethod
+    def _format_row(row):
+        """
+        Format the values of a row as SQL literals, dialects override it for their own literal syntax.
+
+        By default values are formatted as `add_quote` does, strings are quoted and escaped, others go through `str`.
+
+        :param row: (iterable) values
+        :return: (list<str>) literals
+        """
+        return add_quote_many(row)
 
 
 __all__ = ['BaseSQLBuilder']
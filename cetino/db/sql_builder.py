@@ -10,25 +10,17 @@ _builder_dict = {
 
 
 class SQLBuilder:
-    supported_dialects = [SQLDialect.SQLITE, SQLDialect.MYSQL]
+    supported_dialects = list(_builder_dict)
 
     def __init__(self, dialect: SQLDialect = SQLDialect.SQLITE):
         self.dialect = dialect
-        self._validate()
-        self._builder = self._get_builder()
-
-    def _get_builder(self):
-        if self.dialect in self.supported_dialects:
-            return _builder_dict[self.dialect]()
-        else:
-            raise NotImplementedError(f"Dialect {self.dialect} is not supported yet.")
-
-    def _validate(self):
-        self._validate_dialect()
-
-    def _validate_dialect(self):
-        if self.dialect not in SQLDialect:
-            raise ValueError(f"Dialect {self.dialect} is not supported.")
+        builder = _builder_dict.get(dialect)
+        if builder is None:
+            if isinstance(dialect, SQLDialect):
+                raise NotImplementedError(f"Dialect {dialect} is not supported yet.")
+            raise ValueError(f"Dialect {dialect} is not supported.")
+        # builders only expose class/static methods, so the class itself is used, no instance needed
+        self._builder = builder
 
 
 __all__ = ["SQLBuilder"]
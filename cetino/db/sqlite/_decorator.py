@@ -1,20 +1,34 @@
+import functools
+
+
+def _connect_nocommit(func):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        # Before calling the decorated function, connect to database if not connected yet
+        if self.is_connect is False:
+            self._connect()
+        return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _connect_commit(func):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        # Run the decorated function in its own transaction, committed when it returns and rolled back
+        # if it raises; inside an active transaction() block it joins that one instead
+        with self.transaction():
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
 def connect(commit=False):
     """
     Decorator for managing connection with SQLite Database
-    """
 
-    def decorator(func):
-        def wrapper(self, *args, **kwargs):
-            # Before calling the decorated function, connect to database
-            if self.is_connect is False:
-                raise ConnectionError(
-                    f"Connection with {self._db_file} is not established. You should use 'with' statement or manually manage the connection.")
-            result = func(self, *args, **kwargs)
-            # After calling the decorated function, commit and disconnect from database if commit is True
-            if commit:
-                self._commit()
-            return result
-
-        return wrapper
-
-    return decorator
+    The connection is established lazily on first use and kept open until the storage is closed.
+    With `commit=True`, the decorated function runs in a transaction (see `SQLiteStorage.transaction`).
+    The returned decorator is specialized for `commit`, so the wrapper does not branch on it per call.
+    """
+    return _connect_commit if commit else _connect_nocommit
@@ -1,41 +1,75 @@
+import functools
+
 from .._base import BaseSQLBuilder
-from cetino.utils.string_utils import add_quote
+
+
+def _quote_text(value: str):
+    """
+    Quote a string as a SQLite literal, doubling embedded double quotes.
+
+    e.g. say "hi" now -> "say ""hi"" now"
+    """
+    escaped_value = value.replace('"', '""')
+    return f'"{escaped_value}"'
+
+
+def _format_value(value):
+    """Fallback for types missing from `_VALUE_FMT`, e.g. str subclasses."""
+    return _quote_text(value) if isinstance(value, str) else str(value)
+
+
+_VALUE_FMT = {
+    str: _quote_text,
+    int: str,
+    float: repr,
+    bool: lambda value: '1' if value else '0',
+    bytes: lambda value: f"X'{value.hex()}'",
+    type(None): lambda value: 'NULL',
+}
+"""Value formatter dispatched on the exact type of a value."""
 
 
 class SQLiteSQLBuilder(BaseSQLBuilder):
-    @classmethod
-    def query_sql(cls, table_name: str, fields_list=None, cond_list=None, order_by_dict=None, limit=None, offset=None):
-        fields_str = ', '.join(fields_list) if fields_list else "*"
-        where_clause = cls.where_clause(cond_list)
-        order_by_clause = cls.order_by_clause(order_by_dict)
-        limit_clause = cls.limit_clause(limit)
-        offset_clause = cls.offset_clause(offset)
-        clauses = cls._select_clause_sep.join(
-            [c for c in [where_clause, order_by_clause, limit_clause, offset_clause] if c != ""])
-        sql = f"""
-SELECT {fields_str}
-FROM {table_name}
-{clauses};"""
-        return sql.strip()
+    _no_limit = -1
+
+    @staticmethod
+    def _format_row(row):
+        """Values formatted by `_VALUE_FMT`, dispatched on their exact type."""
+        fmt = _VALUE_FMT.get
+        return [fmt(type(value), _format_value)(value) for value in row]
 
     @classmethod
-    def insert_sql(cls, table_name: str, data_dict_list: list):
-        if not data_dict_list or len(data_dict_list) == 0:
-            raise ValueError(f"data_dict_list must be a list of dict, got {data_dict_list}")
-        values_list = [[add_quote(value) for value in data_dict.values()] for data_dict in data_dict_list]
-        values_str = ', '.join([f'({", ".join(values)})' for values in values_list])
-        insert_sql = f"""INSERT INTO {table_name} ({', '.join(data_dict_list[0].keys())}) VALUES {values_str};"""
-        return insert_sql.strip()
+    @functools.lru_cache(maxsize=256)
+    def insert_placeholder_sql(cls, table_name: str, keys: tuple):
+        """
+        Parameterized INSERT statement, values are bound by the driver.
+
+        e.g. ('name', 'age') -> 'INSERT INTO users (name, age) VALUES (?, ?);'
+
+        :param table_name: (str) table name
+        :param keys: (tuple) column names
+        :return: (str) insert sql
+        """
+        return f"{cls._insert_prefix(table_name, keys)}({', '.join('?' * len(keys))});"
 
     @classmethod
     def create_table_sql(cls, table_name: str, fields_dict, primary_key_tuple=None, unique_tuple=None, allow_exist=False):
-        allow_exist_clause = "IF NOT EXISTS " if allow_exist else ""
-        fields_declare = cls.fields_declare_sql(fields_dict)
-        primary_key_declare = cls.primary_key_sql(primary_key_tuple) if primary_key_tuple else ""
-        unique_declare = cls.unique_sql(unique_tuple) if unique_tuple else ""
+        if not isinstance(fields_dict, dict):
+            raise TypeError(f"fields_dict must be a dict({{[FIELD_NAME]:[FIELD_TYPE]}}), got {type(fields_dict)}")
+        return cls._create_table_sql(table_name, tuple(fields_dict.items()), tuple(primary_key_tuple or ()),
+                                     tuple(unique_tuple or ()), allow_exist)
 
-        clauses = [fields_declare, primary_key_declare, unique_declare]
-        sql_clauses = cls._declare_clause_sep.join(filter(bool, clauses))
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def _create_table_sql(cls, table_name: str, fields_items: tuple, primary_key_tuple: tuple, unique_tuple: tuple,
+                          allow_exist: bool):
+        allow_exist_clause = "IF NOT EXISTS " if allow_exist else ""
+        clauses = [cls.fields_declare_sql(dict(fields_items))]
+        if primary_key_tuple:
+            clauses.append(cls.primary_key_sql(primary_key_tuple))
+        if unique_tuple:
+            clauses.append(cls.unique_sql(unique_tuple))
+        sql_clauses = cls._declare_clause_sep.join(clauses)
 
         sql = f"""
 CREATE TABLE {allow_exist_clause}{table_name} (
@@ -52,10 +86,9 @@ CREATE TABLE {allow_exist_clause}{table_name} (
     @classmethod
     def delete_sql(cls, table_name, cond_list=None):
         where_clause = cls.where_clause(cond_list)
-        sql = f"""
-DELETE FROM {table_name}
-{where_clause};"""
-        return sql.strip()
+        if where_clause:
+            return f"DELETE FROM {table_name}{cls._select_clause_sep}{where_clause};"
+        return f"DELETE FROM {table_name};"
 
 
 __all__ = ["SQLiteSQLBuilder"]
@@ -1,88 +1,189 @@
-import uuid
+import hashlib
 import logging
 import sqlite3
+import contextlib
 from sqlite3 import Error
 
 from ._decorator import connect
 from cetino.utils.io_utils import ensure_pathlib_path
 from cetino.utils.log_utils import get_console_only_logger, get_logger
 
+default_pragmas = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+}
+"""PRAGMAs issued on every new connection: WAL journal, no fsync per commit, 64MB page cache, 256MB mmap."""
+
+_write_pragmas = ('journal_mode',)
+"""PRAGMAs that need write access to the database file, skipped on read-only connections."""
+
 
 class SQLiteStorage:
-    def __init__(self, data_path, log_path=None):
+    def __init__(self, data_path, log_path=None, pragmas=None, read_only=False):
         """
         Initialization.
         - Create or attach to a sqlite database file.
         - Create a single connection for reuse.(SQLite only support single-thread operation)
+          The connection is opened lazily on first use and kept until `close()` or leaving the 'with' block.
 
         :param data_path: (str | pathlib.Path) database file path
         :param log_path: (str | pathlib.Path | None) log file path, if None, only print to console
+        :param pragmas: (dict | None) overrides of `default_pragmas`, e.g. {'synchronous': 'FULL'}, None value skips a PRAGMA
+        :param read_only: (bool) open the existing database file read-only, e.g. for query or dump workloads
         :return None
         """
-        self._uuid = str(uuid.uuid4())
+        self._read_only = read_only
+        self._pragmas = {**default_pragmas, **(pragmas or {})}
+        if read_only:
+            for name in _write_pragmas:
+                self._pragmas.pop(name, None)
         self._logger = self.__configure_logger(log_path)
+        self._log_info = self._logger.info
+        self._log_error = self._logger.error
         self._db_file = ensure_pathlib_path(data_path)
         self._conn = None
         """Single connection for reuse."""
         self.is_connect = False
         """State variable to indicate whether the connection is established."""
+        self._in_txn = False
+        """State variable to indicate whether a `transaction()` block is active, commits are deferred until it exits."""
 
     @property
     def db_file(self):
         return self._db_file
 
-    @connect()
-    def execute(self, sql: str):
-        """Execute SQL statement."""
-        if self._conn is None:
-            raise ConnectionError(
-                f"Connection with {self._db_file} is not established. You should use 'with' statement or manually manage the connection.")
+    @property
+    def read_only(self):
+        return self._read_only
 
+    @connect()
+    def execute(self, sql: str, parameters=()):
+        """Execute SQL statement, `parameters` are bound to its `?` placeholders."""
         c = self._conn
         try:
-            result = c.execute(sql)
-            self._log(f'Execute SQL: {sql}', level=logging.INFO)
+            result = c.execute(sql, parameters)
+            self._log_info('Execute SQL: %s', sql)
             return result
         except Error as e:
-            self._log(f'Execute SQL: {sql} failed', level=logging.ERROR)
-            self._log(str(e), level=logging.ERROR)
+            self._log_error('Execute SQL: %s failed', sql)
+            self._log_error(str(e))
             raise e  # 直接抛出原始的 error
 
+    @connect()
+    def executemany(self, sql: str, seq_of_parameters):
+        """Execute parameterized SQL statement against every parameter sequence."""
+        c = self._conn
+        try:
+            result = c.executemany(sql, seq_of_parameters)
+            self._log_info('Execute SQL: %s', sql)
+            return result
+        except Error as e:
+            self._log_error('Execute SQL: %s failed', sql)
+            self._log_error(str(e))
+            raise e
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Group several writes into one transaction: committed when the block exits, rolled back on error.
+
+        e.g.
+        with storage.transaction():
+            storage.insert(record_1)
+            storage.insert(record_2)
+
+        Nested blocks join the outermost transaction.
+        """
+        if self._in_txn:
+            yield self
+            return
+        if self.is_connect is False:
+            self._connect()
+        if not self._conn.in_transaction:
+            self.execute('BEGIN')
+        self._in_txn = True
+        try:
+            yield self
+            self._commit()
+        except BaseException:
+            self._rollback()
+            raise
+        finally:
+            self._in_txn = False
+
     def _connect(self):
         if self.is_connect is False:
-            self._log(f'Establishing connection with {self._db_file}...')
-            self._conn = sqlite3.connect(self._db_file)
+            self._log('Establishing connection with %s...', self._db_file)
+            self._conn = self._driver_connect()
+            # no implicit BEGIN from the driver, transactions are opened explicitly by `transaction()`
+            self._conn.isolation_level = None
+            for name, value in self._pragmas.items():
+                if value is not None:
+                    self._conn.execute(f'PRAGMA {name}={value}')
             self.is_connect = True
-            self._log(f'Connection with {self._db_file} established', level=logging.INFO)
+            self._log('Connection with %s established', self._db_file, level=logging.INFO)
         else:
-            self._log(f'Connection with {self._db_file} already established', level=logging.INFO)
+            self._log('Connection with %s already established', self._db_file, level=logging.INFO)
+
+    def _driver_connect(self):
+        """
+        Open the underlying DB-API connection.
+
+        Override to plug in another sqlite3-compatible driver, e.g. one built against a tuned SQLite.
+
+        :return: (sqlite3.Connection) connection
+        """
+        if self._read_only:
+            return sqlite3.connect(f"{self._db_file.resolve().as_uri()}?mode=ro", uri=True)
+        return sqlite3.connect(self._db_file)
 
     def _commit(self):
         self._conn.commit()
-        self._log(f'Commit changes to {self._db_file}', level=logging.INFO)
+        self._log('Commit changes to %s', self._db_file, level=logging.INFO)
+
+    def _rollback(self):
+        self._conn.rollback()
+        self._log('Rollback changes to %s', self._db_file, level=logging.INFO)
 
     def _disconnect(self):
         if self.is_connect is True:
-            self._log(f'Closing connection with {self._db_file}...')
+            self._log('Closing connection with %s...', self._db_file)
             self._conn.close()
             self.is_connect = False
-            self._log(f'Connection with {self._db_file} closed', level=logging.INFO)
+            self._log('Connection with %s closed', self._db_file, level=logging.INFO)
         else:
-            self._log(f'Connection with {self._db_file} already closed', level=logging.INFO)
+            self._log('Connection with %s already closed', self._db_file, level=logging.INFO)
 
-    def _log(self, message: str, level=logging.INFO, **kwargs):
-        self._logger.log(level, message, **kwargs)
+    def close(self):
+        """Close the connection, the next operation will reconnect."""
+        self._disconnect()
+
+    def _log(self, message: str, *args, level=logging.INFO, **kwargs):
+        """Log `message % args`, formatting is skipped by `logging` if `level` is disabled."""
+        self._logger.log(level, message, *args, **kwargs)
 
     def __configure_logger(self, log_path):
         if log_path is None:
-            logger = get_console_only_logger(self._logger_name)
+            logger = get_console_only_logger(self._logger_name())
         else:
-            logger = get_logger(self._logger_name, log_path=log_path, console=False)
+            logger = get_logger(self._logger_name(log_path), log_path=log_path, console=False)
         return logger
 
-    @property
-    def _logger_name(self):
-        return f"{self.__class__.__name__}_{self._uuid}_logger"
+    @classmethod
+    def _logger_name(cls, log_path=None):
+        """
+        Loggers are shared by the instances of a class logging to the same destination,
+        so short-lived instances do not pile up loggers in the `logging` registry.
+
+        The log path is hashed into the name: `logging` treats dots in a name as a hierarchy,
+        so a raw path like 'logs/app.log' would make loggers of unrelated storages parents of each other.
+        """
+        if log_path is None:
+            return f"{cls.__name__}_logger"
+        return f"{cls.__name__}_{hashlib.sha1(str(log_path).encode()).hexdigest()}_logger"
 
     def __str__(self):
         return f"{self.__class__.__name__}({self._db_file})"
@@ -97,5 +198,13 @@ class SQLiteStorage:
     def __exit__(self, exc_type, exc_value, traceback):
         self._disconnect()
 
+    def __del__(self):
+        if getattr(self, 'is_connect', False):
+            try:
+                self._conn.close()
+            except sqlite3.ProgrammingError:
+                # collected in a thread other than the one that created the connection
+                pass
+
 
 __all__ = ["SQLiteStorage"]
@@ -1,21 +1,55 @@
 import abc
+import csv
+import itertools
 import logging
+import operator
 import pandas as pd
 
 from ._decorator import connect
 from .storage import SQLiteStorage
 from .sql_builder import SQLiteSQLBuilder
-from cetino.fs.csv.storage import CSVTableStorage
+from cetino.fs.csv.storage import CSVTableStorage, default_encoding
 from .type import SQLiteDataType
+from cetino.utils.log_utils import get_console_only_logger
 
 default_primary_key_tuple = ('_id',)
+default_insert_batch_size = 10000
+
+_table_metadata_names = ('fields', 'table_name', 'primary_key_tuple', 'unique_tuple')
+"""Class attributes, or properties, defining the table of a `SQLiteTableStorage` subclass."""
+
+
+def _tuple_getter(keys: tuple):
+    """`operator.itemgetter(*keys)`, but always returning a tuple, also for a single key."""
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda record: (record[key],)
+    return operator.itemgetter(*keys)
+
+
+def _metadata_error(metadata, msg: str):
+    """
+    Log `msg` as an error, then return the ValueError to raise for invalid table metadata.
+
+    A class is validated before any instance, and so any instance logger, exists: it logs to the console
+    logger its instances without a `log_path` use.
+
+    :param metadata: (type | SQLiteTableStorage) the class itself, or an instance when the metadata are properties
+    :param msg: (str) error message
+    :return: (ValueError)
+    """
+    if isinstance(metadata, type):
+        get_console_only_logger(metadata._logger_name()).error(msg)
+    else:
+        metadata._log(msg, level=logging.ERROR)
+    return ValueError(msg)
 
 
 class SQLiteTableStorage(SQLiteStorage, abc.ABC):
     """
     SQLite Table Manipulation, DO NOT instantiate this class directly.
 
-    You have to override the following properties to define the table metadata:
+    You have to override the following properties (or define them as class attributes) to define the table metadata:
     - fields: (dict) list of fields, e.g. {'name': SQLiteDataType.TEXT, 'age': SQLiteDataType.INTEGER}
     - table_name: (str) table name, e.g. 'employees'
     - (optional) primary_key_tuple: (tuple) primary key, e.g. ('id'), if not override, return default primary key
@@ -38,16 +72,64 @@ class SQLiteTableStorage(SQLiteStorage, abc.ABC):
 
     @property
     def field_names_list(self):
-        return list(self.fields.keys())
+        return list(self._field_names)
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Validate the table metadata and precompute the SQL that only depends on it, once per subclass.
 
-    def __init__(self, data_path, log_path=None):
+        A misconfigured subclass raises ValueError when it is defined, not each time it is instantiated.
+        Metadata defined as properties is only readable from an instance, and may differ between instances,
+        e.g. a table name derived from a constructor argument, so it is resolved per instance instead.
+        """
+        super().__init_subclass__(**kwargs)
+        cls._metadata_are_properties = any(isinstance(getattr(cls, name), property) for name in _table_metadata_names)
+        if not cls._metadata_are_properties:
+            cls._init_table_metadata(cls)
+
+    def __init__(self, data_path, log_path=None, pragmas=None, read_only=False):
         """
         :param data_path: (str | pathlib.Path) database file path
         :param log_path: (str | pathlib.Path | None) log file path, if None, only print to console
+        :param pragmas: (dict | None) overrides of the default connection PRAGMAs
+        :param read_only: (bool) open the database read-only, writes raise sqlite3.OperationalError
         """
-        super().__init__(data_path, log_path)
+        super().__init__(data_path, log_path, pragmas, read_only)
         self.ddl = None
-        self._validate_table_metadata()
+        if self._metadata_are_properties:
+            self._init_table_metadata(self)
+
+    @staticmethod
+    def _init_table_metadata(metadata):
+        """
+        Validate the table metadata, then precompute the SQL that only depends on it, as attributes of `metadata`.
+
+        :param metadata: (type | SQLiteTableStorage) the class itself, or an instance when the metadata are properties
+        """
+        SQLiteTableStorage._validate_table_metadata(metadata)
+        fields, table_name = metadata.fields, metadata.table_name
+        primary_key_tuple, unique_tuple = metadata.primary_key_tuple, metadata.unique_tuple
+        full_fields = fields.copy()
+        if primary_key_tuple == default_primary_key_tuple:
+            for pk_item in primary_key_tuple:
+                full_fields[pk_item] = SQLiteDataType.INTEGER
+        create_kwargs = dict(table_name=table_name, fields_dict=full_fields,
+                             primary_key_tuple=primary_key_tuple, unique_tuple=unique_tuple)
+        metadata._create_sql = SQLiteSQLBuilder.create_table_sql(**create_kwargs, allow_exist=False)
+        metadata._create_if_not_exists_sql = SQLiteSQLBuilder.create_table_sql(**create_kwargs, allow_exist=True)
+        metadata._drop_sql = SQLiteSQLBuilder.drop_table_sql(table_name, allow_not_exist=False)
+        metadata._drop_if_exists_sql = SQLiteSQLBuilder.drop_table_sql(table_name, allow_not_exist=True)
+        metadata._delete_all_sql = SQLiteSQLBuilder.delete_sql(table_name=table_name)
+        metadata._insert_stmt = SQLiteSQLBuilder.insert_placeholder_sql(table_name, tuple(fields))
+        row_getter = _tuple_getter(tuple(fields))
+        # a function stored on a class would be bound as a method
+        metadata._row_getter = staticmethod(row_getter) if isinstance(metadata, type) else row_getter
+        metadata._select_all_sql = SQLiteSQLBuilder.query_sql(table_name=table_name, fields_list=tuple(fields))
+        # paging values are bound as parameters, so every page reuses the same compiled statement
+        metadata._select_page_sql = SQLiteSQLBuilder.query_sql(table_name=table_name, fields_list=tuple(fields),
+                                                               limit='?', offset='?')
+        # field names snapshot, the metadata is static once resolved
+        metadata._field_names = tuple(fields)
 
     @connect()
     def create(self, allow_exist: bool = False):
@@ -55,16 +137,9 @@ class SQLiteTableStorage(SQLiteStorage, abc.ABC):
         Create table.
         :return: None
         """
-        full_fields = self.fields.copy()
-        if self.primary_key_tuple == default_primary_key_tuple:
-            for pk_item in self.primary_key_tuple:
-                full_fields[pk_item] = SQLiteDataType.INTEGER
-        self.ddl = SQLiteSQLBuilder.create_table_sql(table_name=self.table_name, fields_dict=full_fields,
-                                                     primary_key_tuple=self.primary_key_tuple,
-                                                     unique_tuple=self.unique_tuple,
-                                                     allow_exist=allow_exist)
+        self.ddl = self._create_if_not_exists_sql if allow_exist else self._create_sql
         self.execute(self.ddl)
-        self._log(f'Table {self.table_name} created', level=logging.INFO)
+        self._log('Table %s created', self.table_name, level=logging.INFO)
 
     @connect()
     def drop(self, allow_not_exist=True):
@@ -72,9 +147,8 @@ class SQLiteTableStorage(SQLiteStorage, abc.ABC):
         Drop table.
         :return: None
         """
-        sql = SQLiteSQLBuilder.drop_table_sql(self.table_name, allow_not_exist=allow_not_exist)
-        self.execute(sql)
-        self._log(f'Table {self.table_name} dropped', level=logging.INFO)
+        self.execute(self._drop_if_exists_sql if allow_not_exist else self._drop_sql)
+        self._log('Table %s dropped', self.table_name, level=logging.INFO)
 
     @connect()
     def query(self, limit: int = None, offset: int = None, use_pandas: bool = False):
@@ -86,14 +160,28 @@ class SQLiteTableStorage(SQLiteStorage, abc.ABC):
         :param use_pandas: (bool) if True, return pandas.DataFrame, else return list of dict
         :return: (list<dict> | pd.DataFrame)
         """
-        sql = SQLiteSQLBuilder.query_sql(table_name=self.table_name, fields_list=self.field_names_list,
-                                         limit=limit, offset=offset)
-        records = self.execute(sql)
-        records = [dict(zip([field[0] for field in records.description], record)) for record in records]
+        sql, parameters = self._select_sql(limit=limit, offset=offset)
         if use_pandas:
-            records = pd.DataFrame(records)
-            records.set_index(self.primary_key_tuple, inplace=True)
-        return records
+            # the default primary key is not one of the selected fields
+            index_col = None if self.primary_key_tuple == default_primary_key_tuple else list(self.primary_key_tuple)
+            self._log_info('Execute SQL: %s', sql)
+            return pd.read_sql_query(sql, self._conn, index_col=index_col, params=parameters)
+        cursor = self.execute(sql, parameters)
+        columns = [field[0] for field in cursor.description]
+        return [dict(zip(columns, record)) for record in cursor]
+
+    @connect()
+    def query_raw(self, limit: int = None, offset: int = None):
+        """
+        Get records with full fields from table as plain tuples, ordered as `field_names_list`.
+
+        Skips building a dict per record, use it for large result sets.
+
+        :param limit: (int)
+        :param offset: (int)
+        :return: (list<tuple>)
+        """
+        return self.execute(*self._select_sql(limit=limit, offset=offset)).fetchall()
 
     @connect()
     def query_dump(self, save_path, limit: int = None, offset: int = None):
@@ -105,77 +193,156 @@ class SQLiteTableStorage(SQLiteStorage, abc.ABC):
         :param offset: (int)
         :return: None
         """
-        records = self.query(limit=limit, offset=offset, use_pandas=False)
+        cursor = self.execute(*self._select_sql(limit=limit, offset=offset))
         csv_storage = self.get_csv_storage()
-        self._log(f'Dump {len(records)} records to {save_path}...', level=logging.INFO)
-        csv_storage.write(save_path, records)
-        self._log(f'Dumping finished', level=logging.INFO)
+        self._log('Dump records to %s...', save_path, level=logging.INFO)
+        n_records = csv_storage.write_rows(save_path, cursor)
+        self._log('Dumping finished, %s records dumped', n_records, level=logging.INFO)
 
     @connect(commit=True)
     def insert(self, record: dict):
-        insert_sql = SQLiteSQLBuilder.insert_sql(table_name=self.table_name, data_dict_list=[record])
-        cursor = self.execute(insert_sql)
+        keys = tuple(record)
+        cursor = self.execute(self._insert_sql(keys), tuple(record.values()))
         return cursor.rowcount
 
     @connect(commit=True)
-    def insert_many(self, record_list: list):
-        insert_sql = SQLiteSQLBuilder.insert_sql(table_name=self.table_name, data_dict_list=record_list)
-        cursor = self.execute(insert_sql)
-        return cursor.rowcount
+    def insert_many(self, record_list, batch_size: int = default_insert_batch_size):
+        """
+        Insert records with a single prepared statement, values are bound by sqlite3 rather than quoted into SQL.
+
+        Records are pulled from `record_list` `batch_size` at a time, all batches share one transaction.
+        Any iterable works, e.g. a generator over a large file, only one batch is held in memory.
+
+        :param record_list: (iterable<dict>) records, all with the same keys as the first one
+        :param batch_size: (int) number of records per executemany call
+        :return: (int) number of inserted rows
+        """
+        records = iter(record_list)
+        chunk = list(itertools.islice(records, batch_size))
+        if not chunk:
+            raise ValueError(f"record_list must be a non-empty iterable of dict, got {record_list}")
+        keys = tuple(chunk[0])
+        insert_sql = self._insert_sql(keys)
+        row_getter = self._row_getter if keys == self._field_names else _tuple_getter(keys)
+        n_rows = 0
+        while chunk:
+            n_rows += self.executemany(insert_sql, map(row_getter, chunk)).rowcount
+            chunk = list(itertools.islice(records, batch_size))
+        return n_rows
+
+    @connect(commit=True)
+    def insert_dataframe(self, record_df: pd.DataFrame):
+        """
+        Insert the rows of a DataFrame, without converting them to a list of dict first.
+
+        Columns that are not table fields, and the index, are ignored.
+
+        :param record_df: (pd.DataFrame) records, columns named after the table fields
+        :return: (int) number of inserted rows
+        """
+        keys = tuple(key for key in self._field_names if key in record_df.columns)
+        if not keys:
+            raise ValueError(f"record_df has none of the table fields {self.field_names_list} as columns")
+        rows = record_df[list(keys)].itertuples(index=False, name=None)
+        return self.executemany(self._insert_sql(keys), rows).rowcount
+
+    @connect()
+    def bulk_load_from_csv(self, csv_path, batch_size: int = default_insert_batch_size, null_value: str = ''):
+        """
+        Load the rows of a csv file (e.g. written by `query_dump`) into the table.
+
+        The file is streamed `batch_size` rows at a time, all batches share one transaction.
+        Its header names the table fields the columns are loaded into, values are stored with the
+        column affinity of the table, e.g. '25' becomes 25 in an INTEGER column.
+
+        `query_dump` writes NULL as an empty cell, so by default an empty cell is loaded as NULL.
+
+        :param csv_path: (str | pathlib.Path) csv file path, with a header row
+        :param batch_size: (int) number of rows per executemany call
+        :param null_value: (str | None) cell value loaded as NULL, None to load every cell as is
+        :return: (int) number of inserted rows
+        """
+        with open(csv_path, 'r', newline='', encoding=default_encoding) as f:
+            reader = csv.reader(f)
+            keys = tuple(next(reader, ()))
+            if not keys:
+                raise ValueError(f"{csv_path} has no header row")
+            for key in keys:
+                if key not in self._field_names:
+                    raise ValueError(f'Column "{key}" of {csv_path} is not defined in the fields.')
+            insert_sql = self._insert_sql(keys)
+            n_rows = 0
+            with self.transaction():
+                for rows in iter(lambda: list(itertools.islice(reader, batch_size)), []):
+                    if null_value is not None:
+                        rows = [tuple(None if value == null_value else value for value in row) for row in rows]
+                    n_rows += self.executemany(insert_sql, rows).rowcount
+        self._log('%s records loaded from %s', n_rows, csv_path, level=logging.INFO)
+        return n_rows
 
     @connect(commit=True)
     def empty(self):
-        delete_sql = SQLiteSQLBuilder.delete_sql(table_name=self.table_name)
-        print(f"delete_sql: {delete_sql}")
-        cursor = self.execute(delete_sql)
+        cursor = self.execute(self._delete_all_sql)
         return cursor.rowcount
 
+    def _insert_sql(self, keys: tuple):
+        """Parameterized INSERT for records with `keys`, the full-field statement is precomputed."""
+        if keys == self._field_names:
+            return self._insert_stmt
+        return SQLiteSQLBuilder.insert_placeholder_sql(self.table_name, keys)
+
+    def _select_sql(self, limit: int = None, offset: int = None):
+        """
+        Full-field SELECT and its parameters, both statements are precomputed.
+
+        A negative LIMIT means no limit in SQLite, which also allows an OFFSET without a LIMIT.
+
+        :return: (tuple) sql, parameters
+        """
+        if limit is None and offset is None:
+            return self._select_all_sql, ()
+        return self._select_page_sql, (-1 if limit is None else limit, 0 if offset is None else offset)
+
     def get_csv_storage(self):
-        return CSVTableStorage(fields=list(self.fields.keys()), index_col=self.primary_key_tuple)
-
-    def _validate_table_metadata(self):
-        self._validate_table_name()
-        self._validate_fields()
-        self._validate_unique_fields()
-        self._validate_primary_key()
-
-    def _validate_table_name(self):
-        if not self.table_name:
-            msg = 'Table name is not defined.'
-            self._log(msg, level=logging.ERROR)
-            raise ValueError(msg)
-
-    def _validate_fields(self):
-        if not self.fields or not isinstance(self.fields, dict) or len(self.fields) == 0:
-            msg = 'Fields must be defined as a non-empty dictionary.'
-            self._log(msg, level=logging.ERROR)
-            raise ValueError(msg)
-
-    def _validate_unique_fields(self):
-        if self.unique_tuple:
-            if not isinstance(self.unique_tuple, (list, tuple)):
-                msg = 'The "unique_tuple" attribute must be a list or tuple.'
-                self._log(msg, level=logging.ERROR)
-                raise ValueError(msg)
-            for field in self.unique_tuple:
-                if field not in self.fields:
-                    msg = f'Unique field "{field}" is not defined in the fields.'
-                    self._log(msg, level=logging.ERROR)
-                    raise ValueError(msg)
-
-    def _validate_primary_key(self):
+        return CSVTableStorage(fields=list(self._field_names), index_col=self.primary_key_tuple)
+
+    @staticmethod
+    def _validate_table_metadata(metadata):
+        """:param metadata: (type | SQLiteTableStorage) the class itself, or an instance when the metadata are properties"""
+        SQLiteTableStorage._validate_table_name(metadata)
+        SQLiteTableStorage._validate_fields(metadata)
+        SQLiteTableStorage._validate_unique_fields(metadata)
+        SQLiteTableStorage._validate_primary_key(metadata)
+
+    @staticmethod
+    def _validate_table_name(metadata):
+        if not metadata.table_name:
+            raise _metadata_error(metadata, 'Table name is not defined.')
+
+    @staticmethod
+    def _validate_fields(metadata):
+        if not metadata.fields or not isinstance(metadata.fields, dict) or len(metadata.fields) == 0:
+            raise _metadata_error(metadata, 'Fields must be defined as a non-empty dictionary.')
+
+    @staticmethod
+    def _validate_unique_fields(metadata):
+        if metadata.unique_tuple:
+            if not isinstance(metadata.unique_tuple, (list, tuple)):
+                raise _metadata_error(metadata, 'The "unique_tuple" attribute must be a list or tuple.')
+            for field in metadata.unique_tuple:
+                if field not in metadata.fields:
+                    raise _metadata_error(metadata, f'Unique field "{field}" is not defined in the fields.')
+
+    @staticmethod
+    def _validate_primary_key(metadata):
         # 1. primary key tuple cannot be empty
-        if not self.primary_key_tuple or not isinstance(self.primary_key_tuple, (list, tuple)):
-            msg = '`primary_key_tuple` must be a non-empty list or tuple.'
-            self._log(msg, level=logging.ERROR)
-            raise ValueError(msg)
-        if self.primary_key_tuple != default_primary_key_tuple:
+        if not metadata.primary_key_tuple or not isinstance(metadata.primary_key_tuple, (list, tuple)):
+            raise _metadata_error(metadata, '`primary_key_tuple` must be a non-empty list or tuple.')
+        if metadata.primary_key_tuple != default_primary_key_tuple:
             # 2. user specified primary key must be defined in the fields
-            for pk_item in self.primary_key_tuple:
-                if pk_item not in self.fields:
-                    msg = f'User specified primary key "{pk_item}" is not defined in the fields.'
-                    self._log(msg, level=logging.ERROR)
-                    raise ValueError(msg)
+            for pk_item in metadata.primary_key_tuple:
+                if pk_item not in metadata.fields:
+                    raise _metadata_error(metadata, f'User specified primary key "{pk_item}" is not defined in the fields.')
 
 
 __all__ = ['SQLiteTableStorage']
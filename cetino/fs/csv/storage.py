@@ -1,36 +1,113 @@
+import io
+import os
 import csv
+import operator
+import functools
+import itertools
+import threading
+import collections
 import pandas as pd
 
 from cetino.utils.io_utils import ensure_pathlib_path
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional dependency, fall back to the csv module / pandas C parser
+    pa = pa_csv = None
+
+default_encoding = 'utf-8'
+"""Encoding of csv files, for every read and write path (pandas and pyarrow read utf-8 as well)."""
+
+default_io_buffer_size = 1 << 20
+"""Buffer size (1MB) for opening csv files that are read or written as a whole, header reads keep the default."""
+
+_append_flags = os.O_WRONLY | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+"""`os.open` flags of csv appends, O_BINARY keeps the csv line terminators untranslated on Windows."""
+
+
+def _advise_sequential(f):
+    """Tell the kernel `f` is read front to back, so it reads ahead more, no-op where posix_fadvise is missing."""
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+def _write_buffer(fd, buf: io.StringIO):
+    """Write the csv text accumulated in `buf` to `fd`, then empty `buf`."""
+    view = memoryview(buf.getvalue().encode(default_encoding))
+    while view:
+        view = view[os.write(fd, view):]
+    buf.seek(0)
+    buf.truncate()
+
+
+@functools.lru_cache(maxsize=256)
+def _read_fieldnames(path_str: str, mtime_ns: int, size: int):
+    """
+    Header row of a csv file, cached per file version.
+
+    `mtime_ns` and `size` are only part of the cache key, so a modified file is read again.
+    A header without quotes is split on commas, a quoted one goes through `csv.reader`.
+
+    :return: (tuple<str> | None) field names, None for an empty file
+    """
+    with open(path_str, 'r', encoding=default_encoding, newline='') as f:
+        line = f.readline()
+        if not line:
+            return None
+        if '"' not in line:
+            return tuple(line.rstrip('\r\n').split(','))
+        # a quoted field may also span several lines
+        return tuple(next(csv.reader(itertools.chain([line], f))))
+
 
 def fields_match(func):
     """
     A decorator to ensure that the fields of the CSV file match the expected fields.
     """
 
+    @functools.wraps(func)
     def wrapper(self, file_path, *args, **kwargs):
         file_path = ensure_pathlib_path(file_path)
-        if not file_path.exists():
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
             return func(self, file_path, *args, **kwargs)
 
-        with open(file_path, 'r') as f:
-            reader = csv.DictReader(f)
-            match = reader.fieldnames is None or reader.fieldnames == self.fields
-            print("match: ", match)
-            if not match:
-                raise ValueError(
-                    f"The fields in {file_path} do not match the expected fields. Expected: {self.fields}, Actual: {reader.fieldnames}")
+        fieldnames = _read_fieldnames(str(file_path), stat.st_mtime_ns, stat.st_size)
+        if fieldnames is not None and fieldnames != tuple(self.fields):
+            raise ValueError(
+                f"The fields in {file_path} do not match the expected fields. Expected: {self.fields}, Actual: {list(fieldnames)}")
         return func(self, file_path, *args, **kwargs)
 
     return wrapper
 
 
+class _PendingWrite:
+    """A `CSVTableStorage.write` call waiting to be flushed, `error` is set if its flush failed."""
+    __slots__ = ('file_path', 'rows', 'error')
+
+    def __init__(self, file_path, rows):
+        self.file_path = file_path
+        self.rows = rows
+        self.error = None
+
+
 class CSVTableStorage:
-    def __init__(self, fields, index_col=None):
+    def __init__(self, fields, index_col=None, dtypes=None):
+        """
+        :param fields: (list<str>) field names, in column order
+        :param index_col: (str | tuple | None) column(s) used as the index of dataframes
+        :param dtypes: (dict | None) dtype per field, e.g. {'age': 'int64'}, read into dataframes without type inference
+        """
         self.fields = fields
         self.index_col = index_col
+        self.dtypes = dtypes
         self._validate()
+        self._pending = collections.deque()
+        """`write` calls waiting to be flushed, as `_PendingWrite`."""
+        self._write_lock = threading.Lock()
+        """Held by the thread flushing `_pending`, or writing through `write_rows` or `write_from_df`."""
 
     @staticmethod
     def from_dict(record_dict: dict):
@@ -57,10 +134,20 @@ class CSVTableStorage:
         """
         Read the csv file, return records
 
+        Parsed by pyarrow's multithreaded reader when it is installed, values are kept as strings either way.
+
         :param file_path: (str) path to the csv file
         :return: (list<dict>)
         """
-        with open(file_path, 'r') as f:
+        if pa_csv is not None and file_path.stat().st_size > 0:
+            table = pa_csv.read_csv(
+                file_path,
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(column_types=dict.fromkeys(self.fields, pa.string())),
+            )
+            return table.to_pylist()
+        with open(file_path, 'r', buffering=default_io_buffer_size, encoding=default_encoding, newline='') as f:
+            _advise_sequential(f)
             reader = csv.DictReader(f)
             return [row for row in reader]
 
@@ -69,13 +156,44 @@ class CSVTableStorage:
         """
         Read the csv file, return records
 
+        Only `fields` are parsed, with `dtypes` when declared, by the pyarrow engine when it is installed.
+
         :param file_path: (str) path to the csv file
-        :return: (list<dict>)
+        :return: (pd.DataFrame) records, indexed by `index_col`
         """
-        record_df = pd.read_csv(file_path, index_col=self.index_col)
-        self.fields = record_df.columns.tolist()
+        if pa_csv is not None:
+            record_df = pd.read_csv(file_path, encoding=default_encoding, index_col=self._pandas_index_col(),
+                                    usecols=self.fields, dtype=self.dtypes, engine='pyarrow')
+        else:
+            record_df = pd.read_csv(file_path, encoding=default_encoding, index_col=self._pandas_index_col(),
+                                    usecols=self.fields, dtype=self.dtypes, engine='c', memory_map=True,
+                                    low_memory=False)
         return record_df
 
+    @fields_match
+    def iter_read(self, file_path, chunksize: int = 50_000, use_pandas: bool = False):
+        """
+        Read the csv file `chunksize` records at a time
+
+        Memory stays bounded by one chunk whatever the file size, prefer `read` / `read_to_df`
+        when the whole file fits in memory, they parse it in one pass.
+
+        :param file_path: (str) path to the csv file
+        :param chunksize: (int) number of records per chunk
+        :param use_pandas: (bool) if True, yield pd.DataFrame chunks (indexed by `index_col`), else list<dict>
+        :return: (generator<list<dict> | pd.DataFrame>)
+        """
+        if use_pandas:
+            with pd.read_csv(file_path, encoding=default_encoding, index_col=self._pandas_index_col(),
+                             dtype=self.dtypes, chunksize=chunksize) as reader:
+                yield from reader
+            return
+        with open(file_path, 'r', buffering=default_io_buffer_size, encoding=default_encoding, newline='') as f:
+            _advise_sequential(f)
+            reader = csv.DictReader(f)
+            for chunk in iter(lambda: list(itertools.islice(reader, chunksize)), []):
+                yield chunk
+
     @fields_match
     def write(self, file_path, records: list):
         """
@@ -85,17 +203,57 @@ class CSVTableStorage:
         Else, check if the fields are the same as the existing file, if not, raise ValueError.
         Else, append the records to the existing file.
 
+        Concurrent calls are combined: the thread holding the write lock flushes every pending call,
+        with one open per file. Records are on disk when the call returns, if the flush fails,
+        every call whose records were in it raises the error.
+        A DataFrame is written as by `write_from_df`.
+
         :param file_path: (str) path to the csv file
-        :param records: (list<dict>)
+        :param records: (list<dict> | pd.DataFrame)
         :return: None
         """
-        file_path = ensure_pathlib_path(file_path)
+        if isinstance(records, pd.DataFrame):
+            self._append_dataframe(file_path, records)
+            return
         if not records or len(records) == 0:
             return
-        if not file_path.exists():
-            self._write_new_file(file_path, records)
-        else:
-            self._append_to_existing_file(file_path, records)
+        # converted before queuing, so invalid records fail their own call, not a combined flush
+        pending_write = _PendingWrite(file_path, list(self._record_rows(records)))
+        self._pending.append(pending_write)
+        with self._write_lock:
+            batch = [self._pending.popleft() for _ in range(len(self._pending))]
+            # an empty batch means another thread flushed these records while we waited
+            for path, group in itertools.groupby(batch, key=operator.attrgetter('file_path')):
+                group = list(group)
+                try:
+                    self._append_rows(path, itertools.chain.from_iterable(write.rows for write in group))
+                except Exception as e:
+                    for write in group:
+                        write.error = e
+        if pending_write.error is not None:
+            raise pending_write.error
+
+    @fields_match
+    def write_rows(self, file_path, rows, chunk_size: int = 10000):
+        """
+        Write row tuples to the csv file, streaming `chunk_size` rows at a time
+
+        Same file handling as `write`, but rows are plain sequences ordered as `fields`
+        (e.g. a sqlite3 cursor), so the whole result never has to be held in memory.
+        Like `write`, it holds the write lock while writing, so concurrent writes to the same
+        storage never interleave, they wait until `rows` is exhausted.
+
+        :param file_path: (str) path to the csv file
+        :param rows: (iterable<tuple>) rows ordered as `fields`
+        :param chunk_size: (int) number of rows written per batch
+        :return: (int) number of rows written
+        """
+        rows = iter(rows)
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return 0
+        with self._write_lock:
+            return self._append_rows(file_path, itertools.chain(chunk, rows), chunk_size)
 
     @fields_match
     def write_from_df(self, file_path, record_df: pd.DataFrame):
@@ -106,38 +264,133 @@ class CSVTableStorage:
         Else, check if the fields are the same as the existing file, if not, raise ValueError.
         Else, append the records to the existing file.
 
+        The dataframe is written by pandas directly, the index is not written.
+
         :param file_path: (str) path to the csv file
-        :param record_df: (pd.DataFrame) dataframe to write
+        :param record_df: (pd.DataFrame) dataframe to write, a missing field is written as an empty cell,
+            a column that is not a field raises ValueError
         :return: None
         """
-        # first convert record_df to list of dict
-        records = record_df.to_dict(orient='records')
-        self.write(file_path, records)
+        self._append_dataframe(file_path, record_df)
 
     @staticmethod
     def read_header(file_path):
         """
         Read the csv file, return header
 
+        Served from the same per-file-version cache as the `fields_match` check.
+
         :param file_path: (str) path to the csv file
-        :return: (list<dict>)
+        :return: (list<str> | None) field names, None for an empty file
         """
-        with open(file_path, 'r') as f:
-            reader = csv.DictReader(f)
-            return reader.fieldnames
+        stat = os.stat(file_path)
+        fieldnames = _read_fieldnames(str(file_path), stat.st_mtime_ns, stat.st_size)
+        return None if fieldnames is None else list(fieldnames)
 
-    def _write_new_file(self, file_path, records):
-        file_path = ensure_pathlib_path(file_path)
-        with open(file_path, 'w') as f:
-            writer = csv.DictWriter(f, fieldnames=self.fields)
-            writer.writeheader()
-            writer.writerows(records)
+    def _open_for_append(self, file_path):
+        """
+        Open the csv file for appending with `os.open`, creating it if it does not exist yet.
 
-    def _append_to_existing_file(self, file_path, records):
-        file_path = ensure_pathlib_path(file_path)
-        with open(file_path, 'a') as f:
-            writer = csv.DictWriter(f, fieldnames=self.fields)
-            writer.writerows(records)
+        Exclusive creation tells a new file from an existing one without a separate `exists()` check.
+        A created file gets its header row right away, a later failure must not leave a file without header.
+
+        :param file_path: (pathlib.Path) path to the csv file
+        :return: (int) file descriptor opened with O_APPEND
+        """
+        try:
+            fd = os.open(file_path, _append_flags | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            return os.open(file_path, _append_flags)
+        try:
+            buf = io.StringIO()
+            csv.writer(buf).writerow(self.fields)
+            _write_buffer(fd, buf)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def _append_dataframe(self, file_path, record_df: pd.DataFrame, chunk_size: int = 10000):
+        """Columnar write path: `record_df` goes straight to `to_csv`, its cells never become Python dicts."""
+        if record_df.empty:
+            return
+        # as in `write`, a column that is not a field raises, a missing one is written as empty cells
+        wrong_fields = set(record_df.columns) - set(self.fields)
+        if wrong_fields:
+            raise ValueError(f"dataframe contains columns not in fields: {', '.join(map(repr, wrong_fields))}")
+        record_df = record_df.reindex(columns=self.fields)
+        with self._write_lock:
+            fd = self._open_for_append(file_path)
+            buf = io.StringIO()
+            try:
+                for start in range(0, len(record_df), chunk_size):
+                    record_df.iloc[start:start + chunk_size].to_csv(buf, header=False, index=False, lineterminator='\r\n')
+                    if buf.tell() >= default_io_buffer_size:
+                        _write_buffer(fd, buf)
+                _write_buffer(fd, buf)
+            finally:
+                os.close(fd)
+
+    def _append_rows(self, file_path, rows, chunk_size: int = 10000):
+        """
+        Append rows to the csv file, creating it with a header row if it does not exist yet.
+
+        The csv text is built in memory and handed to `os.write` about once per `default_io_buffer_size`,
+        instead of one buffered write per row. With O_APPEND, each of those writes lands at the end of
+        the file even if another process appends to it too.
+
+        :param file_path: (pathlib.Path) path to the csv file
+        :param rows: (iterable<tuple>) rows ordered as `fields`
+        :param chunk_size: (int) number of rows serialized between buffer size checks
+        :return: (int) number of rows written
+        """
+        fd = self._open_for_append(file_path)
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        rows = iter(rows)
+        n_rows = 0
+        try:
+            for chunk in iter(lambda: list(itertools.islice(rows, chunk_size)), []):
+                writer.writerows(chunk)
+                n_rows += len(chunk)
+                if buf.tell() >= default_io_buffer_size:
+                    _write_buffer(fd, buf)
+            _write_buffer(fd, buf)
+        finally:
+            os.close(fd)
+        return n_rows
+
+    def _record_rows(self, records):
+        """
+        Records as row tuples ordered as `fields`, for `csv.writer`.
+
+        Rows are extracted by `operator.itemgetter`. As with `csv.DictWriter`, a missing field is written
+        as '' and a key that is not a field raises ValueError.
+        """
+        fields = self.fields
+        n_fields = len(fields)
+        if n_fields == 1:
+            field = fields[0]
+            getter = lambda record: (record[field],)
+        else:
+            getter = operator.itemgetter(*fields)
+        for record in records:
+            try:
+                row = getter(record)
+            except KeyError:
+                row = tuple(record.get(field, '') for field in fields)
+            else:
+                if len(record) == n_fields:
+                    yield row
+                    continue
+            wrong_fields = record.keys() - set(fields)
+            if wrong_fields:
+                raise ValueError(f"dict contains fields not in fields: {', '.join(map(repr, wrong_fields))}")
+            yield row
+
+    def _pandas_index_col(self):
+        """`index_col` as accepted by every `pd.read_csv` engine, the pyarrow one rejects tuples."""
+        return list(self.index_col) if isinstance(self.index_col, tuple) else self.index_col
 
     def _validate(self):
         if self.fields is None or len(self.fields) == 0:
@@ -0,0 +1 @@
+from .storage import *
@@ -0,0 +1,146 @@
+import os
+import pandas as pd
+
+from cetino.utils.io_utils import ensure_pathlib_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, checked when a ParquetTableStorage is created
+    pa = pq = None
+
+
+class ParquetTableStorage:
+    """
+    Columnar alternative to `CSVTableStorage`, with the same API.
+
+    Parquet files are typed, compressed and read column by column, so they are much smaller and faster
+    to load than csv. But they are immutable: appending to an existing file rewrites it, so write
+    records in few large batches rather than many small ones, or stick to csv for append-heavy use.
+
+    Requires pyarrow.
+    """
+
+    def __init__(self, fields, index_col=None, compression='zstd'):
+        """
+        :param fields: (list<str>) field names, in column order
+        :param index_col: (str | tuple | None) column(s) used as the index of dataframes
+        :param compression: (str) parquet compression codec, e.g. 'zstd', 'snappy', 'lz4'
+        """
+        if pq is None:
+            raise ImportError("ParquetTableStorage requires pyarrow, install it with `pip install cetino[pyarrow]`")
+        self.fields = fields
+        self.index_col = index_col
+        self.compression = compression
+        self._validate()
+
+    @staticmethod
+    def from_dataframe(df: pd.DataFrame):
+        """
+        Create a ParquetTableStorage from a dataframe
+
+        :param df: (pd.DataFrame) a dataframe
+        :return: (ParquetTableStorage)
+        """
+        return ParquetTableStorage(fields=df.columns.tolist(), index_col=df.index.name)
+
+    def read(self, file_path):
+        """
+        Read the parquet file, return records
+
+        :param file_path: (str) path to the parquet file
+        :return: (list<dict>)
+        """
+        return self._read_table(file_path).to_pylist()
+
+    def read_to_df(self, file_path):
+        """
+        Read the parquet file, return records
+
+        :param file_path: (str) path to the parquet file
+        :return: (pd.DataFrame) records, indexed by `index_col`
+        """
+        record_df = self._read_table(file_path).to_pandas()
+        if self.index_col:
+            record_df = record_df.set_index(list(self.index_col) if isinstance(self.index_col, tuple) else self.index_col)
+        return record_df
+
+    def write(self, file_path, records: list):
+        """
+        Write records to the parquet file
+
+        If the file does not exist, create it and write the records.
+        Else, check if the fields are the same as the existing file, if not, raise ValueError.
+        Else, append the records to the existing file, by rewriting it.
+
+        :param file_path: (str) path to the parquet file
+        :param records: (list<dict>) records, a missing field is stored as null
+        :return: None
+        """
+        if not records:
+            return
+        table = pa.table({field: [record.get(field) for record in records] for field in self.fields})
+        self._write_table(file_path, table)
+
+    def write_from_df(self, file_path, record_df: pd.DataFrame):
+        """
+        Write records to the parquet file, same file handling as `write`, the index is not written.
+
+        :param file_path: (str) path to the parquet file
+        :param record_df: (pd.DataFrame) dataframe to write
+        :return: None
+        """
+        if record_df.empty:
+            return
+        table = pa.Table.from_pandas(record_df[self.fields], preserve_index=False)
+        self._write_table(file_path, table)
+
+    @staticmethod
+    def read_header(file_path):
+        """
+        Read the field names from the parquet file schema, without reading any data
+
+        :param file_path: (str) path to the parquet file
+        :return: (list<str>)
+        """
+        return pq.read_schema(file_path).names
+
+    def _read_table(self, file_path):
+        self._check_fields(ensure_pathlib_path(file_path))
+        return pq.read_table(file_path, columns=self.fields)
+
+    def _write_table(self, file_path, table):
+        file_path = ensure_pathlib_path(file_path)
+        if self._check_fields(file_path):
+            table = pa.concat_tables([pq.read_table(file_path), table], promote_options='default')
+        # write aside then swap, a failed write leaves the existing file intact
+        tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+        pq.write_table(table, tmp_path, compression=self.compression, use_dictionary=True)
+        os.replace(tmp_path, file_path)
+
+    def _check_fields(self, file_path):
+        """
+        Ensure the fields of an existing parquet file match the expected fields.
+
+        :return: (bool) whether the file exists
+        """
+        if not file_path.exists():
+            return False
+        names = self.read_header(file_path)
+        if names != list(self.fields):
+            raise ValueError(
+                f"The fields in {file_path} do not match the expected fields. Expected: {self.fields}, Actual: {names}")
+        return True
+
+    def _validate(self):
+        if self.fields is None or len(self.fields) == 0:
+            raise ValueError("fields cannot be empty")
+
+    def __str__(self):
+        return f"ParquetTableStorage(fields={self.fields}, index_col={self.index_col})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+__all__ = ['ParquetTableStorage']
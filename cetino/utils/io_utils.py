@@ -1,4 +1,11 @@
 import pathlib
+import functools
+
+
+@functools.lru_cache(maxsize=1024)
+def _to_pathlib_path(path: str):
+    """Memoized `pathlib.Path(path)`, hot paths convert the same few path strings over and over."""
+    return pathlib.Path(path)
 
 
 def ensure_pathlib_path(path):
@@ -10,6 +17,8 @@ def ensure_pathlib_path(path):
     """
     if path is None:
         return None
+    if isinstance(path, str):
+        return _to_pathlib_path(path)
     if not isinstance(path, pathlib.Path):
         path = pathlib.Path(path)
     return path
@@ -1,10 +1,25 @@
 import sys
 import logging
+import functools
 
 DEFAULT_LOG_FMT = "'%(asctime)s %(levelname)s %(message)s'"
 
+_LOGGER_CACHE = {}
+"""Configured loggers by (name, log_path, log_fmt, console), repeated `get_logger` calls skip the handler scan."""
+
+
+@functools.lru_cache(maxsize=None)
+def _get_formatter(log_fmt: str):
+    """One shared `logging.Formatter` per format string."""
+    return logging.Formatter(log_fmt)
+
 
 def get_logger(name: str, log_path=None, log_fmt=DEFAULT_LOG_FMT, console=True):
+    cache_key = (name, None if log_path is None else str(log_path), log_fmt, console)
+    logger = _LOGGER_CACHE.get(cache_key)
+    if logger is not None:
+        return logger
+
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
@@ -12,16 +27,17 @@ def get_logger(name: str, log_path=None, log_fmt=DEFAULT_LOG_FMT, console=True):
         if not any(isinstance(hdlr, logging.FileHandler) and hdlr.baseFilename == str(log_path) for hdlr in logger.handlers):
             fh = logging.FileHandler(log_path)
             fh.setLevel(logging.INFO)
-            fh.setFormatter(logging.Formatter(log_fmt))
+            fh.setFormatter(_get_formatter(log_fmt))
             logger.addHandler(fh)
 
     if console:
         if not any(isinstance(hdlr, logging.StreamHandler) for hdlr in logger.handlers):
             ch = logging.StreamHandler(sys.stdout)  # set stream to stdout
             ch.setLevel(logging.INFO)
-            ch.setFormatter(logging.Formatter(log_fmt))
+            ch.setFormatter(_get_formatter(log_fmt))
             logger.addHandler(ch)
 
+    _LOGGER_CACHE[cache_key] = logger
     return logger
 
 
@@ -1,14 +1,33 @@
+_QUOTE_TABLE = str.maketrans({'\\': '\\\\', '"': '\\"', '\x00': '\\0'})
+"""Backslash escapes applied by `add_quote` in a single pass."""
+
+
 def add_quote(value):
     """
     Add quote to value if it is a string.
 
+    Backslashes, double quotes and NUL characters are backslash-escaped.
+
     e.g. "John" -> "\"John\""
 
     :param value: (str) value to be quoted
     :return: (str) quoted value
     """
     if isinstance(value, str):
-        escaped_value = value.replace('"', '\\"')
+        escaped_value = value.translate(_QUOTE_TABLE)
         return f'"{escaped_value}"'
     else:
         return str(value)
+
+
+def add_quote_many(values):
+    """
+    `add_quote` applied to every value, in a single comprehension without a function call per value.
+
+    e.g. ["John", 25] -> ["\"John\"", "25"]
+
+    :param values: (iterable) values to be quoted
+    :return: (list<str>) quoted values
+    """
+    table = _QUOTE_TABLE
+    return [f'"{value.translate(table)}"' if isinstance(value, str) else str(value) for value in values]
@@ -1,4 +1,4 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 with open("requirements.txt", "r") as f:
     requirements = f.read().splitlines()
@@ -6,8 +6,20 @@ with open("requirements.txt", "r") as f:
 setup(
     name='cetino',
     version='0.1.3',
-    packages=find_packages(),
+    packages=[
+        'cetino',
+        'cetino.db',
+        'cetino.db._base',
+        'cetino.db.mysql',
+        'cetino.db.postgre',
+        'cetino.db.sqlite',
+        'cetino.fs',
+        'cetino.fs.csv',
+        'cetino.fs.parquet',
+        'cetino.utils',
+    ],
     install_requires=requirements,
+    extras_require={'pyarrow': ['pyarrow>=14']},
     author='steveflyer',
     author_email='steveflyer7@gmail.com',
     description='Store and load your data in a unified and light-weight way.',
@@ -33,6 +33,16 @@ class TestBaseSQLBuilder(unittest.TestCase):
         print(f"[test_where_clause] result: {result}, expected: WHERE age > 20 AND name = \"John\"")
         self.assertEqual(result, 'WHERE age > 20 AND name = "John"')
 
+    def test_limit_clause(self):
+        self.assertEqual(BaseSQLBuilder.limit_clause(None), "")
+        self.assertEqual(BaseSQLBuilder.limit_clause(0), "LIMIT 0")
+        self.assertEqual(BaseSQLBuilder.limit_clause(10), "LIMIT 10")
+
+    def test_offset_clause(self):
+        self.assertEqual(BaseSQLBuilder.offset_clause(None), "")
+        self.assertEqual(BaseSQLBuilder.offset_clause(0), "OFFSET 0")
+        self.assertEqual(BaseSQLBuilder.offset_clause(5), "OFFSET 5")
+
 
 class TestSQLiteSQLBuilder(unittest.TestCase):
 
@@ -47,6 +57,16 @@ class TestSQLiteSQLBuilder(unittest.TestCase):
         expected_sql = 'SELECT name, age\nFROM users\nWHERE age > 20\nORDER BY age DESC\nLIMIT 10;'
         self.assertEqual(result, expected_sql)
 
+    def test_query_sql_limit_zero(self):
+        result = SQLiteSQLBuilder.query_sql("users", ["name"], limit=0)
+        print(f"[test_query_sql_limit_zero] result: {result}, expected: SELECT name\nFROM users\nLIMIT 0;")
+        self.assertEqual(result, 'SELECT name\nFROM users\nLIMIT 0;')
+
+    def test_query_sql_offset_without_limit(self):
+        result = SQLiteSQLBuilder.query_sql("users", ["name"], offset=0)
+        print(f"[test_query_sql_offset_without_limit] result: {result}, expected: SELECT name\nFROM users\nLIMIT -1\nOFFSET 0;")
+        self.assertEqual(result, 'SELECT name\nFROM users\nLIMIT -1\nOFFSET 0;')
+
     def test_insert_sql(self):
         table_name = "users"
         data = [{"name": "John", "age": 25}, {"name": "Jane", "age": 30}]
@@ -55,6 +75,25 @@ class TestSQLiteSQLBuilder(unittest.TestCase):
         expected_sql = 'INSERT INTO users (name, age) VALUES ("John", 25), ("Jane", 30);'
         self.assertEqual(result, expected_sql)
 
+    def test_insert_sql_columnar(self):
+        result = SQLiteSQLBuilder.insert_sql_columnar("users", ("name", "age"), [("John", 25), ("Jane", 30)])
+        expected_sql = 'INSERT INTO users (name, age) VALUES ("John", 25), ("Jane", 30);'
+        print(f"[test_insert_sql_columnar] result: {result}, expected: {expected_sql}")
+        self.assertEqual(result, expected_sql)
+
+    def test_insert_sql_value_types(self):
+        table_name = "users"
+        data = [{"name": 'John "Jr"', "age": None, "active": True, "avatar": b"\x01\xff"}]
+        result = SQLiteSQLBuilder.insert_sql(table_name, data)
+        expected_sql = 'INSERT INTO users (name, age, active, avatar) VALUES ("John ""Jr""", NULL, 1, X\'01ff\');'
+        print(f"[test_insert_sql_value_types] result: {result}, expected: {expected_sql}")
+        self.assertEqual(result, expected_sql)
+
+    def test_insert_placeholder_sql(self):
+        result = SQLiteSQLBuilder.insert_placeholder_sql("users", ("name", "age"))
+        print(f"[test_insert_placeholder_sql] result: {result}, expected: INSERT INTO users (name, age) VALUES (?, ?);")
+        self.assertEqual(result, 'INSERT INTO users (name, age) VALUES (?, ?);')
+
     def test_create_table_sql(self):
         table_name = "users"
         fields = {"name": FieldType.TEXT, "age": FieldType.INTEGER}
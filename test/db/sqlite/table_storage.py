@@ -1,7 +1,10 @@
 import os
+import queue
+import sqlite3
 import unittest
 import threading
 from pathlib import Path
+import pandas as pd
 from cetino.db.sqlite.type import SQLiteDataType
 from cetino.db.sqlite.table_storage import SQLiteTableStorage
 
@@ -28,6 +31,29 @@ def threaded_insert(thread_id, db_file):
         storage_instance.insert_many(data)
 
 
+def produce_records(thread_id, record_queue):
+    record_queue.put([{'name': f'name_{thread_id}_{i}', 'age': i} for i in range(RECORD_COUNT)])
+    record_queue.put(None)  # this producer is done
+
+
+def consume_records(db_file, record_queue, n_producers):
+    """Single writer: every drain of the queue is inserted with one insert_many call."""
+    storage_instance = TestStorage(db_file)
+    n_done = 0
+    with storage_instance:
+        while n_done < n_producers:
+            batches = [record_queue.get()]
+            while True:
+                try:
+                    batches.append(record_queue.get_nowait())
+                except queue.Empty:
+                    break
+            n_done += batches.count(None)
+            records = [record for batch in batches if batch is not None for record in batch]
+            if records:
+                storage_instance.insert_many(records)
+
+
 def threaded_query(db_file, expected_count=None):
     storage_instance = TestStorage(db_file)
     with storage_instance:
@@ -56,7 +82,7 @@ class TestSQLiteTableStorage(unittest.TestCase):
             os.remove('test.csv')
 
     def test_validate_table_name(self):
-        with self.assertRaises(ValueError):
+        with self.assertLogs(level='ERROR'), self.assertRaises(ValueError):
             class InvalidStorage(SQLiteTableStorage):
                 fields = {'name': SQLiteDataType.TEXT}
                 table_name = ""
@@ -90,6 +116,73 @@ class TestSQLiteTableStorage(unittest.TestCase):
 
             InvalidStorage(DB_FILE)
 
+    def test_property_metadata(self):
+        class PropertyStorage(SQLiteTableStorage):
+            @property
+            def fields(self) -> dict:
+                return {'name': SQLiteDataType.TEXT, 'age': SQLiteDataType.INTEGER}
+
+            @property
+            def table_name(self) -> str:
+                return 'property_table'
+
+        storage = PropertyStorage(DB_FILE)
+        with storage:
+            storage.create()
+            storage.insert({'name': 'Alice', 'age': 25})
+            result = storage.query()
+        self.assertEqual(result, [{'name': 'Alice', 'age': 25}])
+        self.assertEqual(storage.field_names_list, ['name', 'age'])
+
+    def test_property_metadata_per_instance(self):
+        class NamedStorage(SQLiteTableStorage):
+            fields = {'name': SQLiteDataType.TEXT}
+
+            def __init__(self, data_path, name):
+                self.name = name
+                super().__init__(data_path)
+
+            @property
+            def table_name(self) -> str:
+                return self.name
+
+        storage_1, storage_2 = NamedStorage(DB_FILE, 't1'), NamedStorage(DB_FILE, 't2')
+        with storage_1:
+            storage_1.create()
+            storage_1.insert({'name': 'Alice'})
+        with storage_2:
+            storage_2.create()
+            storage_2.insert({'name': 'Bob'})
+        with storage_1:
+            self.assertEqual(storage_1.query(), [{'name': 'Alice'}])
+            storage_1.drop()
+        with storage_2:
+            self.assertEqual(storage_2.query(), [{'name': 'Bob'}])
+            storage_2.drop()
+
+    def test_validate_property_metadata(self):
+        class InvalidPropertyStorage(SQLiteTableStorage):
+            @property
+            def fields(self) -> dict:
+                return {'name': SQLiteDataType.TEXT}
+
+            @property
+            def table_name(self) -> str:
+                return 'invalid_table'
+
+            @property
+            def unique_tuple(self) -> tuple:
+                return ('invalid_field',)
+
+        with self.assertLogs(level='ERROR'), self.assertRaises(ValueError):
+            InvalidPropertyStorage(DB_FILE)
+
+    def test_logger_name(self):
+        logger_name = self.TestStorage._logger_name('logs/app.log')
+        self.assertNotIn('.', logger_name)
+        self.assertNotEqual(logger_name, self.TestStorage._logger_name('logs/app_log'))
+        self.assertEqual(logger_name, self.TestStorage._logger_name('logs/app.log'))
+
     def test_insert_and_query(self):
         with self.storage:
             self.storage.insert({'name': 'Alice', 'age': 25})
@@ -98,6 +191,13 @@ class TestSQLiteTableStorage(unittest.TestCase):
         self.assertEqual(result[0]['name'], 'Alice')
         self.assertEqual(result[0]['age'], 25)
 
+    def test_insert_quoted_text(self):
+        name = 'O\'Neil "Jr" \\'
+        with self.storage:
+            self.storage.insert({'name': name, 'age': None})
+            result = self.storage.query(use_pandas=False)
+        self.assertEqual(result, [{'name': name, 'age': None}])
+
     def test_insert_many_and_query(self):
         with self.storage:
             data = [{'name': 'Alice', 'age': 25}, {'name': 'Bob', 'age': 30}]
@@ -105,12 +205,113 @@ class TestSQLiteTableStorage(unittest.TestCase):
             result = self.storage.query(use_pandas=False)
         self.assertEqual(len(result), 2)
 
+    def test_insert_many_in_batches(self):
+        with self.storage:
+            data = [{'name': f'name_{i}', 'age': i} for i in range(25)]
+            n_rows = self.storage.insert_many(data, batch_size=10)
+            result = self.storage.query(use_pandas=False)
+        self.assertEqual(n_rows, 25)
+        self.assertEqual(len(result), 25)
+
+    def test_insert_dataframe(self):
+        df = pd.DataFrame({'age': [25, 30], 'name': ['Alice', 'Bob'], 'extra': [0, 0]})
+        with self.storage:
+            n_rows = self.storage.insert_dataframe(df)
+            result = self.storage.query(use_pandas=False)
+        self.assertEqual(n_rows, 2)
+        self.assertEqual(result, [{'name': 'Alice', 'age': 25}, {'name': 'Bob', 'age': 30}])
+
+    def test_query_raw(self):
+        with self.storage:
+            self.storage.insert_many([{'name': 'Alice', 'age': 25}, {'name': 'Bob', 'age': 30}])
+            result = self.storage.query_raw(limit=1, offset=1)
+        self.assertEqual(result, [('Bob', 30)])
+
+    def test_query_offset_without_limit(self):
+        with self.storage:
+            self.storage.insert_many([{'name': 'Alice', 'age': 25}, {'name': 'Bob', 'age': 30}])
+            result = self.storage.query(offset=1)
+            result_df = self.storage.query(limit=1, use_pandas=True)
+        self.assertEqual(result, [{'name': 'Bob', 'age': 30}])
+        self.assertEqual(result_df['name'].tolist(), ['Alice'])
+
+    def test_query_use_pandas(self):
+        with self.storage:
+            data = [{'name': 'Alice', 'age': 25}, {'name': 'Bob', 'age': 30}]
+            self.storage.insert_many(data)
+            result = self.storage.query(use_pandas=True)
+        self.assertEqual(result.columns.tolist(), ['name', 'age'])
+        self.assertEqual(result['name'].tolist(), ['Alice', 'Bob'])
+
+    def test_empty(self):
+        with self.storage:
+            self.storage.insert_many([{'name': 'Alice', 'age': 25}, {'name': 'Bob', 'age': 30}])
+            n_deleted = self.storage.empty()
+            result = self.storage.query(use_pandas=False)
+        self.assertEqual(n_deleted, 2)
+        self.assertEqual(result, [])
+
+    def test_transaction(self):
+        with self.storage:
+            with self.storage.transaction():
+                self.storage.insert({'name': 'Alice', 'age': 25})
+                self.storage.insert({'name': 'Bob', 'age': 30})
+            with self.assertRaises(RuntimeError):
+                with self.storage.transaction():
+                    self.storage.insert({'name': 'Carol', 'age': 35})
+                    raise RuntimeError('abort')
+            result = self.storage.query(use_pandas=False)
+        self.assertEqual([record['name'] for record in result], ['Alice', 'Bob'])
+
+    def test_insert_many_from_generator(self):
+        with self.storage:
+            records = ({'name': f'name_{i}', 'age': i} for i in range(5))
+            n_rows = self.storage.insert_many(records, batch_size=2)
+            result = self.storage.query_raw()
+        self.assertEqual(n_rows, 5)
+        self.assertEqual(result, [(f'name_{i}', i) for i in range(5)])
+
+    def test_insert_many_rolls_back_on_error(self):
+        with self.storage:
+            data = [{'name': 'Alice', 'age': 25}, {'name': 'Bob'}]
+            with self.assertRaises(KeyError):
+                self.storage.insert_many(data, batch_size=1)
+            result = self.storage.query()
+        self.assertEqual(result, [])
+
+    def test_read_only(self):
+        with self.storage:
+            self.storage.insert({'name': 'Alice', 'age': 25})
+        read_only_storage = self.TestStorage(DB_FILE, read_only=True)
+        with read_only_storage:
+            self.assertEqual(read_only_storage.query_raw(), [('Alice', 25)])
+            with self.assertRaises(sqlite3.OperationalError):
+                read_only_storage.insert({'name': 'Bob', 'age': 30})
+
+    def test_lazy_connection(self):
+        self.storage.insert({'name': 'Alice', 'age': 25})
+        self.assertTrue(self.storage.is_connect)
+        self.assertEqual(len(self.storage.query()), 1)
+        self.storage.close()
+        self.assertFalse(self.storage.is_connect)
+
     def test_query_dump(self):
         with self.storage:
             data = [{'name': 'Alice', 'age': 25}]
             self.storage.insert_many(data)
             self.storage.query_dump('test.csv')
         self.assertTrue(Path('test.csv').exists())
+        self.assertEqual(Path('test.csv').read_text().splitlines(), ['name,age', 'Alice,25'])
+
+    def test_bulk_load_from_csv(self):
+        with self.storage:
+            self.storage.insert_many([{'name': 'Alice', 'age': 25}, {'name': 'Bob', 'age': 30}, {'name': 'Carol', 'age': None}])
+            self.storage.query_dump('test.csv')
+            self.storage.empty()
+            n_rows = self.storage.bulk_load_from_csv('test.csv', batch_size=1)
+            result = self.storage.query_raw()
+        self.assertEqual(n_rows, 3)
+        self.assertEqual(result, [('Alice', 25), ('Bob', 30), ('Carol', None)])
 
 
 class MultiThreadedSQLiteTest(unittest.TestCase):
@@ -152,6 +353,23 @@ class MultiThreadedSQLiteTest(unittest.TestCase):
 
         self.assertEqual(len(result), THREAD_COUNT * RECORD_COUNT)
 
+    def test_multi_threaded_insert_single_writer(self):
+        record_queue = queue.Queue(maxsize=THREAD_COUNT)
+        writer = threading.Thread(target=consume_records, args=(DB_FILE, record_queue, THREAD_COUNT))
+        writer.start()
+
+        producers = [threading.Thread(target=produce_records, args=(i, record_queue)) for i in range(THREAD_COUNT)]
+        for t in producers:
+            t.start()
+        for t in producers:
+            t.join()
+        writer.join()
+
+        with self.storage:
+            result = self.storage.query_raw()
+
+        self.assertEqual(len(result), THREAD_COUNT * RECORD_COUNT)
+
     def test_multi_threaded_query(self):
         # First, insert some data
         with self.storage:
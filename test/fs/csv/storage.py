@@ -0,0 +1,152 @@
+import os
+import time
+import unittest
+import threading
+from pathlib import Path
+import pandas as pd
+from cetino.fs.csv.storage import CSVTableStorage
+
+CSV_FILE = 'test_storage.csv'
+
+
+class TestCSVTableStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.storage = CSVTableStorage(fields=['name', 'age'])
+
+    def tearDown(self):
+        if Path(CSV_FILE).exists():
+            os.remove(CSV_FILE)
+
+    def test_write_and_read(self):
+        self.storage.write(CSV_FILE, [{'name': 'Alice', 'age': 25}, {'name': 'Bob, Jr', 'age': None}])
+        result = self.storage.read(CSV_FILE)
+        self.assertEqual(result, [{'name': 'Alice', 'age': '25'}, {'name': 'Bob, Jr', 'age': ''}])
+
+    def test_read_to_df_dtypes(self):
+        self.storage.write(CSV_FILE, [{'name': 'Alice', 'age': 25}])
+        storage = CSVTableStorage(fields=['name', 'age'], dtypes={'age': 'float32'})
+        self.assertEqual(str(storage.read_to_df(CSV_FILE)['age'].dtype), 'float32')
+
+    def test_write_missing_field(self):
+        self.storage.write(CSV_FILE, [{'name': 'Alice', 'age': 25}, {'name': 'Bob'}])
+        self.assertEqual(Path(CSV_FILE).read_text().splitlines(), ['name,age', 'Alice,25', 'Bob,'])
+
+    def test_read_to_df(self):
+        self.storage.write(CSV_FILE, [{'name': 'Alice', 'age': 25}])
+        storage = CSVTableStorage(fields=['name', 'age'], index_col=('name',))
+        result = storage.read_to_df(CSV_FILE)
+        self.assertEqual(result.index.tolist(), ['Alice'])
+        self.assertEqual(result['age'].tolist(), [25])
+        self.assertEqual(storage.fields, ['name', 'age'])
+
+    def test_iter_read(self):
+        self.storage.write(CSV_FILE, [{'name': f'name_{i}', 'age': i} for i in range(5)])
+        chunks = list(self.storage.iter_read(CSV_FILE, chunksize=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[2], [{'name': 'name_4', 'age': '4'}])
+        df_chunks = list(self.storage.iter_read(CSV_FILE, chunksize=2, use_pandas=True))
+        self.assertEqual(pd.concat(df_chunks)['age'].tolist(), [0, 1, 2, 3, 4])
+
+    def test_write_from_df(self):
+        record_df = pd.DataFrame({'age': [25, 30], 'name': ['Alice', 'Bob']})
+        self.storage.write_from_df(CSV_FILE, record_df)
+        self.storage.write_from_df(CSV_FILE, record_df.iloc[:1])
+        self.assertEqual(Path(CSV_FILE).read_text().splitlines(), ['name,age', 'Alice,25', 'Bob,30', 'Alice,25'])
+
+    def test_write_from_df_missing_field(self):
+        self.storage.write_from_df(CSV_FILE, pd.DataFrame({'name': ['Alice']}))
+        self.assertEqual(self.storage.read(CSV_FILE), [{'name': 'Alice', 'age': ''}])
+
+    def test_write_from_df_unknown_field(self):
+        with self.assertRaises(ValueError):
+            self.storage.write_from_df(CSV_FILE, pd.DataFrame({'name': ['Alice'], 'age': [25], 'bogus': [1]}))
+        self.assertFalse(Path(CSV_FILE).exists())
+
+    def test_mixed_writes_line_terminator(self):
+        self.storage.write(CSV_FILE, [{'name': 'Alice', 'age': 25}])
+        self.storage.write_from_df(CSV_FILE, pd.DataFrame({'name': ['Bob'], 'age': [30]}))
+        self.assertEqual(Path(CSV_FILE).read_bytes(), b'name,age\r\nAlice,25\r\nBob,30\r\n')
+
+    def test_write_dataframe(self):
+        self.storage.write(CSV_FILE, pd.DataFrame({'name': ['Alice'], 'age': [25]}))
+        self.assertEqual(self.storage.read(CSV_FILE), [{'name': 'Alice', 'age': '25'}])
+
+    def test_multi_threaded_write(self):
+        def write_records(thread_id):
+            self.storage.write(CSV_FILE, [{'name': f'name_{thread_id}_{i}', 'age': i} for i in range(50)])
+
+        threads = [threading.Thread(target=write_records, args=(thread_id,)) for thread_id in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result = self.storage.read(CSV_FILE)
+        self.assertEqual(len(result), 20 * 50)
+        self.assertEqual(Path(CSV_FILE).read_text().splitlines()[0], 'name,age')
+
+    def test_write_invalid_records(self):
+        with self.assertRaises(ValueError):
+            self.storage.write(CSV_FILE, [{'name': 'Alice', 'age': 25, 'bogus': 1}])
+        self.assertFalse(Path(CSV_FILE).exists())
+
+    def test_write_rows_failure_keeps_header(self):
+        def failing_rows():
+            yield ('Alice', 25)
+            raise RuntimeError('source failed')
+
+        with self.assertRaises(RuntimeError):
+            self.storage.write_rows(CSV_FILE, failing_rows(), chunk_size=1)
+        self.storage.write(CSV_FILE, [{'name': 'Bob', 'age': 30}])
+        self.assertEqual(Path(CSV_FILE).read_text().splitlines()[0], 'name,age')
+        self.assertEqual(self.storage.read(CSV_FILE)[-1], {'name': 'Bob', 'age': '30'})
+
+    def test_write_rows_holds_write_lock(self):
+        thread = threading.Thread(target=self.storage.write_rows, args=(CSV_FILE, [('Alice', 25)]))
+        with self.storage._write_lock:
+            thread.start()
+            thread.join(0.05)
+            self.assertFalse(Path(CSV_FILE).exists())
+        thread.join()
+        self.assertEqual(self.storage.read(CSV_FILE), [{'name': 'Alice', 'age': '25'}])
+
+    def test_combined_write_errors(self):
+        errors = {}
+
+        def write_records(file_path):
+            try:
+                self.storage.write(file_path, [{'name': 'Alice', 'age': 25}])
+            except OSError as e:
+                errors[file_path] = e
+
+        file_paths = [CSV_FILE, os.path.join('missing_dir', 'a.csv'), os.path.join('missing_dir', 'b.csv')]
+        # hold the lock so that every call is queued, then flushed together by one of them
+        with self.storage._write_lock:
+            threads = [threading.Thread(target=write_records, args=(file_path,)) for file_path in file_paths]
+            for thread in threads:
+                thread.start()
+            while len(self.storage._pending) < len(file_paths):
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(errors), sorted(file_paths[1:]))
+        self.assertEqual(self.storage.read(CSV_FILE), [{'name': 'Alice', 'age': '25'}])
+
+    def test_quoted_header(self):
+        storage = CSVTableStorage(fields=['name, first', 'age'])
+        storage.write(CSV_FILE, [{'name, first': 'Alice', 'age': 25}])
+        storage.write(CSV_FILE, [{'name, first': 'Bob', 'age': 30}])
+        self.assertEqual(storage.read(CSV_FILE), [{'name, first': 'Alice', 'age': '25'}, {'name, first': 'Bob', 'age': '30'}])
+
+    def test_read_header(self):
+        self.storage.write(CSV_FILE, [{'name': 'Alice', 'age': 25}])
+        self.assertEqual(CSVTableStorage.read_header(CSV_FILE), ['name', 'age'])
+
+    def test_fields_mismatch(self):
+        self.storage.write(CSV_FILE, [{'name': 'Alice', 'age': 25}])
+        with self.assertRaises(ValueError):
+            CSVTableStorage(fields=['name']).read(CSV_FILE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import unittest
+from pathlib import Path
+import pandas as pd
+from cetino.fs.parquet.storage import ParquetTableStorage, pq
+
+PARQUET_FILE = 'test_storage.parquet'
+
+
+@unittest.skipIf(pq is None, 'pyarrow is not installed')
+class TestParquetTableStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.storage = ParquetTableStorage(fields=['name', 'age'])
+
+    def tearDown(self):
+        if Path(PARQUET_FILE).exists():
+            os.remove(PARQUET_FILE)
+
+    def test_write_and_read(self):
+        self.storage.write(PARQUET_FILE, [{'name': 'Alice', 'age': 25}])
+        self.storage.write(PARQUET_FILE, [{'name': 'Bob'}])
+        result = self.storage.read(PARQUET_FILE)
+        self.assertEqual(result, [{'name': 'Alice', 'age': 25}, {'name': 'Bob', 'age': None}])
+
+    def test_write_from_df_and_read_to_df(self):
+        record_df = pd.DataFrame({'age': [25, 30], 'name': ['Alice', 'Bob']})
+        self.storage.write_from_df(PARQUET_FILE, record_df)
+        result = ParquetTableStorage(fields=['name', 'age'], index_col=('name',)).read_to_df(PARQUET_FILE)
+        self.assertEqual(result.index.tolist(), ['Alice', 'Bob'])
+        self.assertEqual(result['age'].tolist(), [25, 30])
+
+    def test_fields_mismatch(self):
+        self.storage.write(PARQUET_FILE, [{'name': 'Alice', 'age': 25}])
+        with self.assertRaises(ValueError):
+            ParquetTableStorage(fields=['name']).write(PARQUET_FILE, [{'name': 'Bob'}])
+
+
+if __name__ == "__main__":
+    unittest.main()